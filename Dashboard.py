@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+import numpy as np
+import os
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 
 # Set page configuration
 st.set_page_config(
@@ -10,122 +15,111 @@ st.set_page_config(
     page_icon="\U0001F4C8"
 )
 
-# Custom CSS
-st.markdown("""
-    <style>
-    .metric-row {
-        display: flex;
-        justify-content: space-between;
-        padding: 8px 0;
-        border-bottom: 1px solid #444;
-    }
-    .metric-label {
-        color: #aaa;
-        font-size: 0.9em;
-    }
-    .metric-value {
-        color: #fff;
-        font-weight: 500;
-    }
-    .stock-card {
-        background-color: #1E1E1E;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        border: 1px solid #444;
-        min-height: 400px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-    .stock-header {
-        display: flex;
-        justify-content: space-between;
-        align-items: flex-start;
-        margin-bottom: 15px;
-        padding-bottom: 10px;
-        border-bottom: 1px solid #444;
-    }
-    .stock-metrics {
-        background-color: #2A2A2A;
-        padding: 15px;
-        border-radius: 8px;
-        margin-top: 10px;
-    }
-    .stock-header a {
-        text-decoration: none;
-        color: white;
-    }
-    .stock-header a:hover {
-        color: #00FFFF;
-    }
-    .about-section {
-        background-color: #2A2A2A;
-        padding: 15px;
-        border-radius: 8px;
-        margin-top: 15px;
-        font-size: 0.9em;
-        color: #ddd;
-        max-height: 100px;
-        overflow-y: auto;
-    }
-    .feature-container {
-        background-color: #1E1E1E;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        border: 1px solid #444;
-    }
-    .section-title {
-        color: #00FFFF;
-        font-size: 1.2em;
-        font-weight: 500;
-        margin-bottom: 15px;
-        padding-bottom: 8px;
-        border-bottom: 1px solid #444;
-    }
-    .feature-description {
-        color: #888;
-        font-size: 0.9em;
-        margin-top: 5px;
-        padding-left: 15px;
-    }
-    .filter-section {
-        background-color: #2A2A2A;
-        padding: 15px;
-        border-radius: 8px;
-        margin-top: 10px;
-    }
-    .stDateInput, .stSelectbox, .stTextInput {
-        margin-top: 10px;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Custom CSS, served once by Streamlit's static file serving (see .streamlit/config.toml)
+st.markdown('<link rel="stylesheet" href="app/static/dashboard.css">', unsafe_allow_html=True)
+
+def _arrow_strings(arrow_type):
+    """Keep string columns Arrow-backed when converting a table to pandas"""
+    return pd.ArrowDtype(arrow_type) if pa.types.is_string(arrow_type) else None
+
+_NUM_RE = r'(?P<value>[-+]?\d+(?:\.\d+)?)'
+
+def _to_float(values):
+    """Extract the first number from a string column and cast it to float32"""
+    values = pc.replace_substring(values, ',', '')
+    return pc.struct_field(pc.extract_regex(values, _NUM_RE), [0]).cast(pa.float32())
+
+# Only the columns the dashboard shows; absent ones load as all-null
+_NUMERIC_COLUMNS = ['LTP', '%chng', 'ROE', 'ROCE', 'P/E Ratio', 'Book Value', 'Dividend Yield', 'Market Cap']
+_CSV_COLUMNS = ['Symbol', "Today's Date", 'Days Since High', 'Sector', 'Industry', 'About'] + _NUMERIC_COLUMNS
+# Explicit types: the streaming reader would otherwise infer them from the first block only
+_CSV_TYPES = {col: pa.string() for col in _CSV_COLUMNS}
+_CSV_TYPES.update({"Today's Date": pa.timestamp('s'), 'Days Since High': pa.float64()})
+_CSV_BLOCK_SIZE = 16 << 20
+
+def _clean(table):
+    """Clean one block of the CSV: numeric text to float32 and normalised symbols"""
+    # Percentages, currency and Market Cap suffixes
+    for col in _NUMERIC_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(col), col, _to_float(table[col]))
+    symbol = pc.utf8_upper(pc.utf8_trim_whitespace(table['Symbol']))
+    return table.set_column(table.schema.get_field_index('Symbol'), 'Symbol', symbol)
+
+def _read_csv(file):
+    """Stream the CSV in blocks and clean each one, so peak memory stays near one raw block"""
+    reader = pv.open_csv(
+        file,
+        read_options=pv.ReadOptions(block_size=_CSV_BLOCK_SIZE),
+        convert_options=pv.ConvertOptions(
+            include_columns=_CSV_COLUMNS,
+            include_missing_columns=True,
+            column_types=_CSV_TYPES,
+            timestamp_parsers=['%d-%b-%Y', pv.ISO8601],
+            strings_can_be_null=True
+        )
+    )
+    chunks = [_clean(pa.Table.from_batches([batch])) for batch in reader]
+    return pa.concat_tables(chunks) if chunks else _clean(reader.schema.empty_table())
 
-@st.cache_data
+# Bump whenever _clean or the CSV columns change, so older Parquet sidecars are rebuilt
+_PARQUET_VERSION = b'1'
+
+def _read_parquet(parquet_file, csv_file):
+    """Read the cleaned table from the Parquet sidecar, or None if it is stale or from another version"""
+    if not os.path.exists(parquet_file) or os.path.getmtime(parquet_file) < os.path.getmtime(csv_file):
+        return None
+    metadata = pq.read_schema(parquet_file).metadata or {}
+    if metadata.get(b'dashboard_version') != _PARQUET_VERSION:
+        return None
+    table = pq.read_table(parquet_file)
+    # Parquet has no second resolution; restore the unit the CSV reader produces
+    date_index = table.schema.get_field_index("Today's Date")
+    return table.set_column(date_index, "Today's Date", table["Today's Date"].cast(pa.timestamp('s')))
+
+def _write_parquet(table, parquet_file):
+    """Write the cleaned table to the Parquet sidecar via a temp file so readers never see a partial file"""
+    metadata = dict(table.schema.metadata or {}, dashboard_version=_PARQUET_VERSION)
+    temp_file = parquet_file + '.tmp'
+    try:
+        pq.write_table(table.replace_schema_metadata(metadata), temp_file, compression='snappy')
+        os.replace(temp_file, parquet_file)
+    except OSError:
+        # A read-only checkout just skips the cache
+        pass
+
+@st.cache_resource
 def load_data(file):
-    """Load and preprocess the data"""
+    """Load and preprocess the data, reusing the cleaned Parquet copy when it is current"""
     try:
-        df = pd.read_csv(file)
-        df["Today's Date"] = pd.to_datetime(df["Today's Date"])
+        # The sidecar holds the cleaned Arrow table, so both paths share the pandas steps below
+        parquet_file = os.path.splitext(file)[0] + '.parquet'
+        table = _read_parquet(parquet_file, file)
+        if table is None:
+            table = _read_csv(file)
+            _write_parquet(table, parquet_file)
         
-        # Clean percentage change column
-        df['%chng'] = df['%chng'].astype(str).str.replace('%', '').str.strip()
-        df['%chng'] = pd.to_numeric(df['%chng'], errors='coerce')
+        df = table.to_pandas(types_mapper=_arrow_strings)
         
-        # Clean numeric columns
-        numeric_columns = ['ROE', 'ROCE', 'P/E Ratio', 'Book Value', 'Dividend Yield']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace('%', '').str.replace('₹', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Undated rows can't match any date filter, and NaT in the index would break slicing
+        df = df.dropna(subset=["Today's Date"])
         
-        # Clean Market Cap column
-        df['Market Cap'] = df['Market Cap'].astype(str).str.replace('₹', '').str.replace(',', '')
-        df['Market Cap'] = pd.to_numeric(df['Market Cap'].str.extract(r'(\d+(?:\.\d+)?)', expand=False), errors='coerce')
+        # Running high per stock, so searches don't re-sort and cummax on every query
+        df = df.sort_values(['Symbol', "Today's Date"], ignore_index=True)
+        df['High_LTP'] = df.groupby('Symbol', sort=False)['LTP'].cummax()
+        if df['Days Since High'].isna().all():
+            high_dates = df["Today's Date"].where(df['LTP'] == df['High_LTP'])
+            last_high = high_dates.groupby(df['Symbol'], sort=False).ffill()
+            df['Days Since High'] = (df["Today's Date"] - last_high).dt.days
+        # Round first: the source column may hold fractional days, which Int32 won't take
+        df['Days Since High'] = df['Days Since High'].round().astype('Int32')
         
-        # Clean Symbol column
-        df['Symbol'] = df['Symbol'].astype(str).str.strip().str.upper()
+        # Repeated labels as categoricals: filters and counts work on integer codes
+        for col in ('Sector', 'Industry', 'Symbol'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
-        return df
+        # Index by date then symbol so date filters are binary-search slices
+        return df.set_index(["Today's Date", 'Symbol']).sort_index()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -148,52 +142,98 @@ def format_number(num):
     except (ValueError, TypeError):
         return "N/A"
 
+def format_numbers(values):
+    """Vectorised format_number: pick each value's scale with numpy, then format once"""
+    num = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    buckets = [num >= 1e9, num >= 1e7, num >= 1e5]
+    scaled = num / np.select(buckets, [1e9, 1e7, 1e5], default=1)
+    templates = np.select(buckets, ["₹{:.2f}B", "₹{:.2f}Cr", "₹{:.2f}L"], default="₹{:,.2f}")
+    return pd.Series(
+        [template.format(value) if not np.isnan(value) else "N/A" for template, value in zip(templates, scaled)],
+        index=values.index
+    )
+
+def format_fixed(values, template='%.2f%%'):
+    """Format a numeric column with a printf-style template, N/A for missing values"""
+    num = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    # Only format present values: templates like '%d' raise on NaN
+    text = np.full(len(num), "N/A", dtype=object)
+    present = ~np.isnan(num)
+    text[present] = np.char.mod(template, num[present])
+    return text
+
+def add_formatted_cols(df):
+    """Precompute the display strings used by the stock cards in one vectorised pass"""
+    missing = pd.Series(np.nan, index=df.index)
+    change = df['%chng'].to_numpy(dtype=float, na_value=np.nan)
+    return df.assign(
+        LTP_fmt=format_numbers(df['LTP']),
+        MCap_fmt=format_numbers(df.get('Market Cap', missing)),
+        Change_fmt=format_fixed(df['%chng'], '%+.2f%%'),
+        Change_color=np.where(change >= 0, '#00FF00', '#FF0000'),
+        ROE_fmt=format_fixed(df.get('ROE', missing)),
+        ROCE_fmt=format_fixed(df.get('ROCE', missing)),
+        PE_fmt=format_fixed(df.get('P/E Ratio', missing), '%.2f'),
+        Yield_fmt=format_fixed(df.get('Dividend Yield', missing)),
+        Days_fmt=format_fixed(df['Days Since High'], '%d')
+    )
+
+def select_symbol(data, symbol):
+    """Select one symbol's rows from the date/symbol indexed data"""
+    try:
+        return data.xs(symbol, level='Symbol', drop_level=False)
+    except KeyError:
+        return data.iloc[:0]
+
+def slice_dates(data, first, last):
+    """Select rows from the first through the last period with a binary search on the date level"""
+    unit = data.index.levels[0].unit
+    start = first.start_time.as_unit(unit)
+    end = (last + 1).start_time.as_unit(unit) - pd.Timedelta(1, unit=unit)
+    return data.loc[start:end]
+
 def get_stock_highs(data, symbol):
-    """Get dates when the stock made new highs"""
+    """Get dates when the stock made new highs, oldest first"""
     if symbol:
-        stock_data = data[data['Symbol'] == symbol].copy()
-        if not stock_data.empty:
-            stock_data = stock_data.sort_values("Today's Date")
-            stock_data['High_LTP'] = stock_data['LTP'].cummax()
-            high_dates = stock_data[stock_data['LTP'] == stock_data['High_LTP']].copy()
-            return high_dates
+        stock_data = select_symbol(data, symbol)
+        return stock_data[stock_data['LTP'] == stock_data['High_LTP']].reset_index()
     return pd.DataFrame()
 
+_SECTOR_CHART_LAYOUT = dict(
+    title={
+        'text': 'Sector Distribution',
+        'x': 0.5,
+        'font_size': 20
+    },
+    xaxis_tickangle=-45,
+    template='plotly_dark',
+    showlegend=False,
+    xaxis_title="Sector",
+    yaxis_title="Number of Companies",
+    height=400,
+    margin=dict(t=50, b=100)
+)
+
 def create_sector_chart(filtered_data):
     """Create a sector distribution bar chart"""
     sector_counts = filtered_data['Sector'].value_counts()
+    sector_counts = sector_counts[sector_counts > 0]
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=sector_counts.index,
         y=sector_counts.values,
         marker_color='rgba(0, 255, 255, 0.6)',
-        text=sector_counts.values,
+        texttemplate='%{y}',
         textposition='auto',
     ))
     
-    fig.update_layout(
-        title={
-            'text': 'Sector Distribution',
-            'x': 0.5,
-            'font_size': 20
-        },
-        xaxis_tickangle=-45,
-        template='plotly_dark',
-        showlegend=False,
-        xaxis_title="Sector",
-        yaxis_title="Number of Companies",
-        height=400,
-        margin=dict(t=50, b=100)
-    )
+    fig.update_layout(**_SECTOR_CHART_LAYOUT)
     
     return fig
 
 def create_stock_card(row):
-    """Create stock card with metrics and details"""
-    price_change = row['%chng']
-    price_color = '#00FF00' if price_change >= 0 else '#FF0000'
-    price_change_display = f"{price_change:+.2f}%" if not pd.isna(price_change) else "N/A"
+    """Create stock card with metrics and details (expects add_formatted_cols columns)"""
     screener_url = f"https://www.screener.in/company/{row['Symbol']}/"
     
     about_text = row.get('About', 'N/A')
@@ -213,35 +253,35 @@ def create_stock_card(row):
             Appearances: <strong style="color: #00FFFF">{row['count']}</strong>
         </div>
         <div style="color: #888; text-align: right;">
-            Last high (Days): <strong style="color: #00FFFF">{row['Days Since High']}</strong>
+            Last high (Days): <strong style="color: #00FFFF">{row['Days_fmt']}</strong>
         </div>
                 </div>
             </div>
             <div style="text-align: right;">
-                <div style="font-size: 1.2em; font-weight: 500;">{format_number(row['LTP'])}</div>
-                <div style="color: {price_color};">{price_change_display}</div>
+                <div style="font-size: 1.2em; font-weight: 500;">{row['LTP_fmt']}</div>
+                <div style="color: {row['Change_color']};">{row['Change_fmt']}</div>
             </div>
         </div>
         <div class="stock-metrics">
             <div class="metric-row">
                 <span class="metric-label">Market Cap</span>
-                <span class="metric-value">{format_number(row.get('Market Cap', 'N/A'))}</span>
+                <span class="metric-value">{row['MCap_fmt']}</span>
             </div>
             <div class="metric-row">
                 <span class="metric-label">ROE</span>
-                <span class="metric-value">{f"{row.get('ROE', 'N/A'):.2f}%" if pd.notnull(row.get('ROE')) else "N/A"}</span>
+                <span class="metric-value">{row['ROE_fmt']}</span>
             </div>
             <div class="metric-row">
                 <span class="metric-label">ROCE</span>
-                <span class="metric-value">{f"{row.get('ROCE', 'N/A'):.2f}%" if pd.notnull(row.get('ROCE')) else "N/A"}</span>
+                <span class="metric-value">{row['ROCE_fmt']}</span>
             </div>
             <div class="metric-row">
                 <span class="metric-label">P/E Ratio</span>
-                <span class="metric-value">{f"{row.get('P/E Ratio', 'N/A'):.2f}" if pd.notnull(row.get('P/E Ratio')) else "N/A"}</span>
+                <span class="metric-value">{row['PE_fmt']}</span>
             </div>
             <div class="metric-row" style="border-bottom: none;">
                 <span class="metric-label">Dividend Yield</span>
-                <span class="metric-value">{f"{row.get('Dividend Yield', 'N/A'):.2f}%" if pd.notnull(row.get('Dividend Yield')) else "N/A"}</span>
+                <span class="metric-value">{row['Yield_fmt']}</span>
             </div>
         </div>
         <div class="about-section">
@@ -252,10 +292,17 @@ def create_stock_card(row):
 
 def get_latest_stock_data(filtered_data):
     """Get the latest data for each stock with count"""
-    stock_counts = filtered_data['Symbol'].value_counts().to_dict()
-    latest_data = filtered_data.sort_values(["Today's Date", '%chng'], ascending=[False, False]).groupby('Symbol').first().reset_index()
-    latest_data['count'] = latest_data['Symbol'].map(stock_counts)
-    return latest_data.sort_values('count', ascending=False)
+    counts = filtered_data.groupby('Symbol', observed=True, sort=False)['Symbol'].transform('size')
+    latest_data = filtered_data.assign(count=counts).sort_values(["Today's Date", '%chng'], ascending=[False, False]).drop_duplicates('Symbol', keep='first')
+    return add_formatted_cols(latest_data.sort_values('count', ascending=False))
+
+@st.cache_data(max_entries=64)
+def get_filtered_views(_filtered_data, filter_key):
+    """Latest stock data and sector chart, cached per filter state"""
+    # The frame itself isn't hashed; filter_key identifies the filters that produced it.
+    # That only holds because load_data is a process-wide cache_resource, so every
+    # session filters the same underlying data.
+    return get_latest_stock_data(_filtered_data), create_sector_chart(_filtered_data)
 
 def create_feature_selector():
     """Create an enhanced feature selector with descriptions"""
@@ -339,36 +386,39 @@ def main():
                     total_highs = len(high_dates)
                     st.metric("Number of High Points", total_highs)
                 with metrics_col3:
-                    latest_high = high_dates["Today's Date"].max()
+                    latest_high = high_dates["Today's Date"].iloc[-1]
                     st.metric("Latest High Date", latest_high.strftime('%d %B %Y'))
                 
                 st.markdown("### High Points Timeline")
                 display_df = high_dates.copy()
                 display_df['Date'] = display_df["Today's Date"].dt.strftime('%d %B %Y')
-                display_df['LTP'] = display_df['LTP'].apply(format_number)
-                display_df['Change'] = display_df['%chng'].apply(lambda x: f"{x:+.2f}%" if pd.notnull(x) else "N/A")
+                display_df['LTP'] = format_numbers(display_df['LTP'])
+                display_df['Change'] = format_fixed(display_df['%chng'], '%+.2f%%')
                 
                 st.dataframe(
-                    display_df[['Date', 'LTP', 'Change']].sort_values("Today's Date", ascending=False),
+                    display_df[['Date', 'LTP', 'Change']].iloc[::-1],
                     hide_index=True,
                     column_config={
                         "Date": "Date",
                         "LTP": "Stock Price",
                         "Change": "Daily Change"
                     }
-                )              
-                # Create price chart
-# Price chart (continuing from previous code)
+                )
+                
+                # Create price chart; highs and prices are already in date order and passed
+                # to Plotly as numpy arrays (float32 prices) to skip Series conversion
+                stock_data = select_symbol(data, search_symbol).reset_index()
+                fig = go.Figure()
                 fig.add_trace(go.Scatter(
-                    x=stock_data["Today's Date"],
-                    y=stock_data['LTP'],
+                    x=stock_data["Today's Date"].to_numpy(),
+                    y=stock_data['LTP'].to_numpy(dtype='float32'),
                     name='Price',
                     line=dict(color='#00FFFF', width=1)
                 ))
                 
                 fig.add_trace(go.Scatter(
-                    x=high_dates["Today's Date"],
-                    y=high_dates['LTP'],
+                    x=high_dates["Today's Date"].to_numpy(),
+                    y=high_dates['LTP'].to_numpy(dtype='float32'),
                     mode='markers',
                     name='High Points',
                     marker=dict(
@@ -389,10 +439,10 @@ def main():
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
-                latest_data = get_latest_stock_data(data[data['Symbol'] == search_symbol])
+                latest_data = get_latest_stock_data(select_symbol(data, search_symbol).reset_index())
                 if not latest_data.empty:
                     st.markdown("### Current Stock Details")
-                    st.markdown(create_stock_card(latest_data.iloc[0]), unsafe_allow_html=True)
+                    st.markdown(create_stock_card(latest_data.to_dict('records')[0]), unsafe_allow_html=True)
             else:
                 st.warning(f"No data found for symbol {search_symbol}")
         else:
@@ -400,15 +450,17 @@ def main():
         return
 
     # Handle other view types
+    first_date, last_date = data.index.levels[0][0], data.index.levels[0][-1]
     if view_type == "Specific Date⌚":
         selected_date = st.sidebar.date_input(
             "📅 Select Date",
-            data["Today's Date"].max(),
-            min_value=data["Today's Date"].min(),
-            max_value=data["Today's Date"].max(),
+            last_date,
+            min_value=first_date,
+            max_value=last_date,
             help="Choose a specific date to analyze"
         )
-        filtered_data = data[data["Today's Date"].dt.date == selected_date]
+        day = pd.Period(selected_date, 'D')
+        filtered_data = slice_dates(data, day, day)
         date_display = selected_date.strftime('%d %B %Y')
     
     elif view_type == "Date Range":
@@ -416,37 +468,34 @@ def main():
         with col1:
             start_date = st.date_input(
                 "📅 Start Date",
-                data["Today's Date"].min(),
+                first_date,
                 help="Select range start date"
             )
         with col2:
             end_date = st.date_input(
                 "📅 End Date",
-                data["Today's Date"].max(),
+                last_date,
                 help="Select range end date"
             )
         
         if start_date <= end_date:
-            filtered_data = data[
-                (data["Today's Date"].dt.date >= start_date) &
-                (data["Today's Date"].dt.date <= end_date)
-            ]
+            filtered_data = slice_dates(data, pd.Period(start_date, 'D'), pd.Period(end_date, 'D'))
             date_display = f"{start_date.strftime('%d %B %Y')} to {end_date.strftime('%d %B %Y')}"
         else:
             st.error("❌ End date must be after start date")
             return
     
     else:  # Month view
-        data['Month'] = data["Today's Date"].dt.strftime('%B %Y')
-        months = sorted(data['Month'].unique(), 
-                       key=lambda x: datetime.strptime(x, '%B %Y'))
+        # Months from the sorted unique dates, not every row
+        months = data.index.levels[0].to_period('M').unique()
         selected_month = st.sidebar.selectbox(
             "📅 Select Month",
             months,
+            format_func=lambda month: month.strftime('%B %Y'),
             help="Choose a month to analyze"
         )
-        filtered_data = data[data["Today's Date"].dt.strftime('%B %Y') == selected_month]
-        date_display = selected_month
+        filtered_data = slice_dates(data, selected_month, selected_month)
+        date_display = selected_month.strftime('%B %Y')
 
     # Stock symbol filter for non-Search views
     if view_type != "Search🔎":
@@ -457,7 +506,7 @@ def main():
         ).strip().upper()
 
     # Sector filter
-    sectors = data['Sector'].unique()
+    sectors = data['Sector'].cat.categories.tolist()
     selected_sectors = st.sidebar.multiselect(
         "🏢 Filter by Sector",
         sectors,
@@ -466,9 +515,10 @@ def main():
 
     # Apply filters
     if search_symbol:
-        filtered_data = filtered_data[filtered_data['Symbol'] == search_symbol]
+        filtered_data = select_symbol(filtered_data, search_symbol)
     if selected_sectors:
         filtered_data = filtered_data[filtered_data['Sector'].isin(selected_sectors)]
+    filtered_data = filtered_data.reset_index()
 
     # Display results
     if not filtered_data.empty:
@@ -485,16 +535,15 @@ def main():
             st.metric("📊 Average Change", f"{avg_change:+.2f}%")
 
         # Sector distribution chart
-        st.plotly_chart(create_sector_chart(filtered_data), use_container_width=True)
+        filter_key = (view_type, date_display, tuple(sorted(selected_sectors)), search_symbol)
+        latest_stock_data, sector_chart = get_filtered_views(filtered_data, filter_key)
+        st.plotly_chart(sector_chart, use_container_width=True)
         
         # Stock cards
         st.markdown("### 📋 Stock Details")
-        latest_stock_data = get_latest_stock_data(filtered_data)
-        
-        stock_col1, stock_col2 = st.columns(2)
-        for idx, row in latest_stock_data.iterrows():
-            with (stock_col1 if idx % 2 == 0 else stock_col2):
-                st.markdown(create_stock_card(row), unsafe_allow_html=True)
+        # Strip each card so the blank lines between them don't end the HTML block
+        cards = "".join(create_stock_card(row).strip() for row in latest_stock_data.to_dict('records'))
+        st.markdown(f'<div class="stock-grid">{cards}</div>', unsafe_allow_html=True)
     else:
         st.warning("⚠️ No data found for the selected filters.")
 